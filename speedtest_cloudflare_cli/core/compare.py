@@ -0,0 +1,284 @@
+"""
+Aggregate stored speedtest results and detect regressions between two time windows.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import math
+import statistics
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from speedtest_cloudflare_cli.models import comparison
+
+# Metric name -> (result sections to read from, field, whether higher values are better)
+METRICS: dict[str, tuple[tuple[str, ...], str, bool]] = {
+    "download": (("download",), "speed", True),
+    "upload": (("upload",), "speed", True),
+    "latency": (("download", "upload"), "latency", False),
+}
+GROUPINGS = ("colo", "asn", "hour")
+OVERALL = "all"
+RESULT_SUFFIXES = (".json", ".jsonl")
+MIN_REGRESSION_SAMPLES = 8  # Per window, below this the normal approximation is unreliable
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.05  # Relative change of the median below which a difference is not a regression
+SECONDS_PER_DAY = 86400
+
+
+@dataclass
+class _Series:
+    """Compact columns of (timestamp, value) pairs for one group."""
+
+    times: array = field(default_factory=lambda: array("d"))
+    values: array = field(default_factory=lambda: array("d"))
+
+    def append(self, timestamp: float, value: float) -> None:
+        self.times.append(timestamp)
+        self.values.append(value)
+
+    def window(self, start: float, end: float) -> list[float]:
+        return [value for timestamp, value in zip(self.times, self.values, strict=True) if start <= timestamp < end]
+
+
+def iter_result_files(paths: Iterable[Path]) -> Iterator[Path]:
+    """Expand directories (result stores) into the result files they contain."""
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix in RESULT_SUFFIXES and p.is_file())
+        else:
+            yield path
+
+
+def iter_records(paths: Iterable[Path]) -> Iterator[Any]:
+    """
+    Stream result records one at a time.
+
+    ``.jsonl`` files hold one result per line and are read line by line; any other file holds
+    a single result (as written by ``--json-output``) or a list of them. Unreadable entries, and files that
+    cannot be read or decoded, yield None so one bad file does not stop the whole comparison.
+    """
+    for path in iter_result_files(paths):
+        try:
+            with path.open() as fp:
+                if path.suffix == ".jsonl":
+                    for line in fp:
+                        if line.strip():
+                            yield _loads(line)
+                else:
+                    data = _loads(fp.read())
+                    if isinstance(data, list):
+                        yield from data
+                    else:
+                        yield data
+        except (OSError, UnicodeDecodeError):
+            yield None
+
+
+def _loads(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+def _parse_timestamp(value: Any) -> datetime.datetime | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        timestamp = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.UTC)
+    return timestamp
+
+
+def _metric_value(record: dict, metric: str) -> float | None:
+    sections, attr, _ = METRICS[metric]
+    for section in sections:
+        value = (record.get(section) or {}).get(attr)
+        # bool is an int subclass, and latency may be "N/A"
+        if isinstance(value, int | float) and not isinstance(value, bool) and math.isfinite(value):
+            return float(value)
+    return None
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Linear-interpolated percentile of an already sorted, non-empty list."""
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(key: str, series: _Series) -> comparison.GroupSummary:
+    values = sorted(series.values)
+    trend = None
+    if len(set(series.times)) > 1:
+        days = [timestamp / SECONDS_PER_DAY for timestamp in series.times]
+        trend = statistics.linear_regression(days, series.values).slope
+    return comparison.GroupSummary(
+        key=key,
+        count=len(values),
+        median=statistics.median(values),
+        p5=percentile(values, 0.05),
+        p95=percentile(values, 0.95),
+        trend=trend,
+    )
+
+
+def mann_whitney_u(baseline: list[float], current: list[float]) -> float:
+    """
+    Two-sided p-value of the Mann-Whitney U test, using the normal approximation with tie correction.
+
+    The test is rank based, so it makes no assumption on the distribution of speeds.
+    """
+    n1, n2 = len(baseline), len(current)
+    n = n1 + n2
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+
+    baseline_rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2 + 1
+        ties = j - i + 1
+        tie_term += ties**3 - ties
+        baseline_rank_sum += average_rank * sum(1 for _, side in combined[i : j + 1] if side == 0)
+        i = j + 1
+
+    u = baseline_rank_sum - n1 * (n1 + 1) / 2
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+    if sigma == 0:
+        return 1.0
+    z = max(abs(u - n1 * n2 / 2) - 0.5, 0) / sigma  # Continuity correction
+    return 2 * (1 - statistics.NormalDist().cdf(z))
+
+
+def holm(p_values: list[float]) -> list[float]:
+    """
+    Holm step-down adjusted p-values, in the order of ``p_values``.
+
+    Controls the family-wise error rate across all the tests, so that checking many groups at once
+    does not flag regressions by chance.
+    """
+    m = len(p_values)
+    adjusted = [0.0] * m
+    running = 0.0
+    for rank, index in enumerate(sorted(range(m), key=p_values.__getitem__)):
+        running = max(running, min(1.0, (m - rank) * p_values[index]))
+        adjusted[index] = running
+    return adjusted
+
+
+class Comparison:
+    """Streaming aggregation of stored results for a single metric."""
+
+    def __init__(self, metric: str = "download"):
+        self.metric = metric
+        self.higher_is_better = METRICS[metric][2]
+        self.runs = 0
+        self.skipped = 0
+        self._series: dict[str, defaultdict[str, _Series]] = {
+            grouping: defaultdict(_Series) for grouping in (OVERALL, *GROUPINGS)
+        }
+
+    def add(self, record: Any) -> None:
+        """Add one result record, skipping it if it lacks a timestamp or the metric."""
+        if not isinstance(record, dict):
+            self.skipped += 1
+            return
+        timestamp = _parse_timestamp(record.get("timestamp"))
+        value = _metric_value(record, self.metric)
+        if timestamp is None or value is None:
+            self.skipped += 1
+            return
+
+        metadata = record.get("metadata") or {}
+        keys = {
+            OVERALL: OVERALL,
+            "colo": str(metadata.get("colo") or "N/A"),
+            "asn": str(metadata.get("asn") or "N/A"),
+            "hour": f"{timestamp.astimezone(datetime.UTC).hour:02d}:00",
+        }
+        epoch = timestamp.timestamp()
+        for grouping, key in keys.items():
+            self._series[grouping][key].append(epoch, value)
+        self.runs += 1
+
+    def summaries(self, grouping: str) -> list[comparison.GroupSummary]:
+        return [summarize(key, series) for key, series in sorted(self._series[grouping].items())]
+
+    def regressions(
+        self,
+        split: datetime.datetime,
+        window: datetime.timedelta | None = None,
+        alpha: float = DEFAULT_ALPHA,
+        groupings: Iterable[str] = GROUPINGS,
+        min_change: float = DEFAULT_MIN_CHANGE,
+    ) -> list[comparison.RegressionCheck]:
+        """
+        Compare the runs before ``split`` (baseline) with the runs from ``split`` on (current).
+
+        Args:
+            split: Boundary between the two windows
+            window: Length of each window around ``split``; unbounded if None
+            alpha: Family-wise significance level, applied to the Holm-adjusted Mann-Whitney U p-values
+            groupings: Groupings checked in addition to the overall population
+            min_change: Minimum relative change of the median for a significant difference to be a regression
+
+        Returns:
+            One check per group with at least MIN_REGRESSION_SAMPLES runs in both windows
+        """
+        boundary = split.timestamp()
+        span = window.total_seconds() if window is not None else math.inf
+
+        checks = []
+        for grouping in (OVERALL, *groupings):
+            for key, series in sorted(self._series[grouping].items()):
+                baseline = series.window(boundary - span, boundary)
+                current = series.window(boundary, boundary + span)
+                if len(baseline) < MIN_REGRESSION_SAMPLES or len(current) < MIN_REGRESSION_SAMPLES:
+                    continue
+
+                baseline_median = statistics.median(baseline)
+                current_median = statistics.median(current)
+                p_value = mann_whitney_u(baseline, current)
+                checks.append(
+                    comparison.RegressionCheck(
+                        group=grouping,
+                        key=key,
+                        baseline_count=len(baseline),
+                        current_count=len(current),
+                        baseline_median=baseline_median,
+                        current_median=current_median,
+                        change=(current_median - baseline_median) / baseline_median if baseline_median else 0.0,
+                        p_value=p_value,
+                        adjusted_p_value=p_value,
+                        regression=False,
+                    )
+                )
+
+        for check, adjusted_p_value in zip(checks, holm([check.p_value for check in checks]), strict=True):
+            worse = check.change < 0 if self.higher_is_better else check.change > 0
+            check.adjusted_p_value = adjusted_p_value
+            check.regression = worse and abs(check.change) >= min_change and adjusted_p_value < alpha
+        return checks
+
+
+def load(paths: Iterable[Path], metric: str = "download") -> Comparison:
+    """Stream every result found under ``paths`` into a Comparison."""
+    result_comparison = Comparison(metric)
+    for record in iter_records(paths):
+        result_comparison.add(record)
+    return result_comparison
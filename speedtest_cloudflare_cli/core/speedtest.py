@@ -1,15 +1,20 @@
 import concurrent.futures
 import contextlib
 import functools
+import itertools
+import json
+import os
 import re
 import socket
 import subprocess
 import threading
 import time
 from collections.abc import Callable, Generator
+from pathlib import Path
 
 import httpx
 import ping3
+import pydantic
 from rich.progress import (
     BarColumn,
     Progress,
@@ -18,22 +23,33 @@ from rich.progress import (
     TransferSpeedColumn,
 )
 
+from speedtest_cloudflare_cli.core import stability
 from speedtest_cloudflare_cli.models import metadata, result
 
 CHUNK_SIZE = 1024 * 1024
+TRANSFER_BLOCK_SIZE = 64 * 1024  # Upload granularity for progress, deadline and stop checks
 CLOUDFLARE_HOST = "speed.cloudflare.com"
 PING_COUNT = 3
 PING_TIMEOUT = 3
 
 # Adaptive mode constants
-PROBE_SIZE_MB = 15  # Size for preliminary probe test (larger for accurate estimation)
 PROBE_TIMEOUT_SECONDS = 3.0  # Max seconds for probe test
+PROBE_SAMPLE_INTERVAL = 0.1  # Seconds between throughput samples during the probe
+PROBE_WINDOW_SECONDS = 0.5  # Minimum span of each (non-overlapping) throughput estimate
+PROBE_STABLE_ESTIMATES = 3  # Consecutive estimates that must agree before the probe stops
+PROBE_STABILITY_TOLERANCE = 0.1  # Max relative spread between those estimates
 TARGET_TEST_DURATION = 10.0  # Target duration for main test in seconds
 MIN_TEST_SIZE_MB = 1  # Minimum test size
 MAX_TEST_SIZE_MB = 500  # Maximum test size for high-speed connections
 MIN_REALISTIC_SPEED = 0.1  # Minimum realistic speed in Mbps
 MAX_REALISTIC_SPEED = 10000  # Maximum realistic speed in Mbps
 PARALLEL_CONNECTIONS = 8  # Number of parallel connections for upload
+LOADED_LATENCY_INTERVAL = 0.5  # Seconds between latency samples while both directions are saturated
+THROUGHPUT_SAMPLE_INTERVAL = 1.0  # Seconds between throughput samples for stability analysis
+
+# Metadata cache constants
+METADATA_CACHE_TTL = 0.0  # Seconds a cached /meta response stays valid on disk (0 = no disk cache)
+METADATA_CACHE_FILE = "metadata.json"
 
 
 @functools.cache
@@ -60,16 +76,117 @@ def track_progress(silent: bool = False) -> Generator[Progress]:
 
 
 @contextlib.contextmanager
-def track_progress_transient(silent: bool = False) -> Generator[Progress]:
-    """Progress bar that disappears when done (for probe tests)."""
-    with Progress(
-        TextColumn("{task.description}"),
-        BarColumn(bar_width=None),
-        TransferSpeedColumn(),
-        disable=silent,
-        transient=True,  # Progress bar disappears when done
-    ) as progress:
-        yield progress
+def sample_throughput(progress: Progress, task: TaskID) -> Generator[list[float]]:
+    """
+    Record the completed bytes of ``task`` every THROUGHPUT_SAMPLE_INTERVAL seconds while the block runs.
+
+    Transfers advance their task on every network read (download) or TRANSFER_BLOCK_SIZE block (upload),
+    so the samples follow the byte flow rather than CHUNK_SIZE steps.
+    """
+    samples = [progress.tasks[task].completed]
+    stop = threading.Event()
+
+    def sample() -> None:
+        while not stop.wait(THROUGHPUT_SAMPLE_INTERVAL):
+            samples.append(progress.tasks[task].completed)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield samples
+    finally:
+        stop.set()
+        sampler.join()
+
+
+def metadata_cache_path() -> Path:
+    """Location of the on-disk /meta cache, honouring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "speedtest-cloudflare-cli" / METADATA_CACHE_FILE
+
+
+def _load_cached_metadata(path: Path, ttl: float) -> dict | None:
+    """Return the cached /meta payload if it is younger than ``ttl`` seconds."""
+    try:
+        with path.open() as fp:
+            cached = json.load(fp)
+        if time.time() - cached["fetched_at"] > ttl:
+            return None
+        return cached["payload"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _store_cached_metadata(path: Path, payload: dict) -> None:
+    """Persist a /meta payload; failures are ignored since the cache is best effort."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as fp:
+            json.dump({"fetched_at": time.time(), "payload": payload}, fp)
+    except OSError:
+        pass
+
+
+def _tcp_latency() -> float | None:
+    """Time a TCP handshake to the server in ms, or None if it cannot be reached."""
+    try:
+        start = time.perf_counter()
+        with socket.create_connection((CLOUDFLARE_HOST, 443), PING_TIMEOUT):
+            return (time.perf_counter() - start) * 1000
+    except OSError:
+        return None
+
+
+def _jitter(times_to_process: list[float]) -> float:
+    """Mean absolute difference between consecutive attempt durations."""
+    jitters = [abs(current - previous) for previous, current in itertools.pairwise(times_to_process)]
+    return sum(jitters) / len(jitters) if jitters else (times_to_process[-1] if times_to_process else 0)
+
+
+def _should_stop(deadline: float | None, stop: threading.Event | None) -> bool:
+    """Whether a transfer must end because its deadline passed or it was asked to stop."""
+    return (deadline is not None and time.perf_counter() > deadline) or (stop is not None and stop.is_set())
+
+
+def _rate(start: tuple[float, int], end: tuple[float, int]) -> float:
+    """Throughput in Mbps between two (timestamp, bytes transferred) samples."""
+    return (end[1] - start[1]) * 8 / ((end[0] - start[0]) * 1_000_000)
+
+
+def _probe_estimate(samples: list[tuple[float, int]]) -> tuple[float | None, bool]:
+    """
+    Estimate throughput from a live (timestamp, bytes transferred) sample series.
+
+    Windows start and end on samples where new bytes were seen, so reads coarser than the
+    sampling interval do not inflate or deflate a window. Consecutive windows span at least
+    PROBE_WINDOW_SECONDS and never overlap, so a single read cannot make several of them agree.
+
+    Returns:
+        Estimate in Mbps (None without data), and whether the last PROBE_STABLE_ESTIMATES
+        windows agree within PROBE_STABILITY_TOLERANCE. A stable estimate covers those windows;
+        otherwise it is the average over the whole series after the first (ramp-up) window.
+    """
+    arrivals = [samples[0]] + [current for previous, current in itertools.pairwise(samples) if current[1] > previous[1]]
+    if len(arrivals) < 2:
+        return None, False
+
+    boundaries = [arrivals[0]]
+    for arrival in arrivals[1:]:
+        if arrival[0] - boundaries[-1][0] >= PROBE_WINDOW_SECONDS:
+            boundaries.append(arrival)
+    rates = [_rate(start, end) for start, end in itertools.pairwise(boundaries)]
+
+    recent = rates[-PROBE_STABLE_ESTIMATES:]
+    if (
+        len(recent) == PROBE_STABLE_ESTIMATES
+        and max(recent) > 0
+        and (max(recent) - min(recent)) / max(recent) <= PROBE_STABILITY_TOLERANCE
+    ):
+        return _rate(boundaries[-PROBE_STABLE_ESTIMATES - 1], boundaries[-1]), True
+
+    # Not settled: skip the ramp-up window when there is anything after it
+    start = boundaries[1] if len(boundaries) > 1 and arrivals[-1][0] > boundaries[1][0] else arrivals[0]
+    return _rate(start, arrivals[-1]), False
 
 
 def _fallback_ping() -> float | str:
@@ -87,26 +204,40 @@ def _fallback_ping() -> float | str:
         pass
 
     # Fallback to TCP latency
-    try:
-        start = time.perf_counter()
-        with socket.create_connection((CLOUDFLARE_HOST, 443), PING_TIMEOUT):
-            return (time.perf_counter() - start) * 1000
-    except OSError:
-        return "N/A"
+    tcp_latency = _tcp_latency()
+    return tcp_latency if tcp_latency is not None else "N/A"
 
 
 class SpeedTest:
-    def __init__(self, url: str, download_size: int, upload_size: int, attempts: int, timeout: float | None = None):
+    def __init__(
+        self,
+        url: str,
+        download_size: int,
+        upload_size: int,
+        attempts: int,
+        timeout: float | None = None,
+        metadata_ttl: float = METADATA_CACHE_TTL,
+    ):
         self.url = url
         self.download_size = download_size
         self.upload_size = upload_size
         self.attempts = attempts
         self.timeout = timeout  # Timeout per test in seconds (None = no timeout)
+        self.metadata_ttl = metadata_ttl  # Disk cache TTL for /meta in seconds (0 = disabled)
 
         self._ping_thread = threading.Thread(target=self.ping, daemon=True)
         self._ping_thread.start()
         self.latency = None
 
+        # Last TCP_INFO snapshot of every transfer connection, per progress task
+        self._tcp_info: dict[TaskID | None, dict[tuple, stability.TcpInfo]] = {}
+        self._tcp_info_lock = threading.Lock()
+
+        # Fetch /meta concurrently with the ping so it is ready once the tests finish
+        self._metadata: metadata.Metadata | None = None
+        self._metadata_thread = threading.Thread(target=self._prefetch_metadata, daemon=True)
+        self._metadata_thread.start()
+
     def _wait(self) -> None:
         if self._ping_thread.is_alive():
             self._ping_thread.join()
@@ -116,16 +247,33 @@ class SpeedTest:
         client().get(f"{self.url}/__down", params={"bytes": 0})
 
     def _download(
-        self, progress: Progress | None = None, task: TaskID | None = None, deadline: float | None = None
+        self,
+        progress: Progress | None = None,
+        task: TaskID | None = None,
+        deadline: float | None = None,
+        stop: threading.Event | None = None,
     ) -> None:
         """Download data in streaming chunks to keep the HTTP connection alive."""
         with client().stream("GET", f"{self.url}/__down", params={"bytes": self.download_size}) as response:
-            # Consume the body in chunks so the server keeps feeding data.
-            for chunk in response.iter_bytes(chunk_size=CHUNK_SIZE):
-                if deadline is not None and time.perf_counter() > deadline:
-                    break  # Timeout reached, stop downloading
+            # Count every network read as it arrives, so progress and the deadline and stop
+            # checks follow the actual byte flow instead of jumping by CHUNK_SIZE.
+            for chunk in response.iter_raw():
+                if _should_stop(deadline, stop):
+                    break  # Timeout reached or probe settled, stop downloading
                 if progress and task is not None:
                     progress.update(task, description="Downloading... 🚀", advance=len(chunk))
+            self._record_tcp_info(task, response)
+
+    def _record_tcp_info(self, task: TaskID | None, response: httpx.Response) -> None:
+        """Keep the latest TCP_INFO snapshot of the connection behind ``response``."""
+        tcp_info = stability.read_tcp_info(response)
+        if tcp_info is not None:
+            with self._tcp_info_lock:
+                self._tcp_info.setdefault(task, {})[tcp_info.connection] = tcp_info
+
+    def _tcp_stats(self, task: TaskID) -> tuple[int | None, float | None, float | None]:
+        with self._tcp_info_lock:
+            return stability.summarize_tcp_info(list(self._tcp_info.get(task, {}).values()))
 
     @functools.cached_property
     def upload_chunk(self) -> bytes:
@@ -143,33 +291,6 @@ class SpeedTest:
         except (ping3.errors.PingError, PermissionError):
             self.latency = _fallback_ping()
 
-    def _upload(
-        self,
-        progress: Progress | None = None,
-        task: TaskID | None = None,
-        deadline: float | None = None,
-    ) -> None:
-        """Upload data in streaming chunks to keep the HTTP connection alive and update progress."""
-        chunk = self.upload_chunk  # Reuse same chunk - no allocation per iteration
-
-        def data_stream():
-            bytes_sent = 0
-            while bytes_sent < self.upload_size:
-                if deadline is not None and time.perf_counter() > deadline:
-                    break  # Timeout reached, stop uploading
-                remaining = self.upload_size - bytes_sent
-                current_chunk = chunk if remaining >= CHUNK_SIZE else chunk[:remaining]
-                bytes_sent += len(current_chunk)
-                if progress and task is not None:
-                    progress.update(task, description="Uploading... 🚀", advance=len(current_chunk))
-                yield current_chunk
-
-        # httpx will read the iterator lazily and stream the request body
-        with client().stream("POST", f"{self.url}/__up", data=data_stream()) as _response:
-            # No need to consume the response body; the context manager ensures the
-            # request completes and the connection is released.
-            pass
-
     def _parallel_upload_worker(
         self,
         upload_size: int,
@@ -177,9 +298,10 @@ class SpeedTest:
         task: TaskID | None,
         deadline: float | None,
         lock: threading.Lock,
+        stop: threading.Event | None = None,
     ) -> int:
         """Worker function for parallel upload. Returns bytes uploaded."""
-        chunk = self.upload_chunk
+        block = self.upload_chunk[:TRANSFER_BLOCK_SIZE]  # Sliced once, reused for every send
         http_client = new_client()
         bytes_uploaded = 0
 
@@ -188,18 +310,18 @@ class SpeedTest:
             def data_stream():
                 nonlocal bytes_uploaded
                 while bytes_uploaded < upload_size:
-                    if deadline is not None and time.perf_counter() > deadline:
+                    if _should_stop(deadline, stop):
                         break
                     remaining = upload_size - bytes_uploaded
-                    current_chunk = chunk if remaining >= CHUNK_SIZE else chunk[:remaining]
+                    current_chunk = block if remaining >= TRANSFER_BLOCK_SIZE else block[:remaining]
                     bytes_uploaded += len(current_chunk)
                     if progress and task is not None:
                         with lock:
                             progress.update(task, description="Uploading... 🚀", advance=len(current_chunk))
                     yield current_chunk
 
-            with http_client.stream("POST", f"{self.url}/__up", data=data_stream()) as _response:
-                pass
+            with http_client.stream("POST", f"{self.url}/__up", data=data_stream()) as response:
+                self._record_tcp_info(task, response)
         finally:
             http_client.close()
 
@@ -210,6 +332,7 @@ class SpeedTest:
         progress: Progress | None = None,
         task: TaskID | None = None,
         deadline: float | None = None,
+        stop: threading.Event | None = None,
     ) -> None:
         """Upload data using multiple parallel connections to maximize bandwidth."""
         total_size = self.upload_size
@@ -225,138 +348,338 @@ class SpeedTest:
                     task,
                     deadline,
                     lock,
+                    stop,
                 )
                 for _ in range(PARALLEL_CONNECTIONS)
             ]
             concurrent.futures.wait(futures)
 
-    def _compute_network_speed(self, progress: Progress, size_to_process: int, func: Callable) -> result.Result:
-        jitter = 0
+    def _run_attempts(
+        self,
+        test_type: str,
+        func: Callable,
+        progress: Progress,
+        task: TaskID,
+        deadline: float | None,
+        adaptive: bool,
+        default_size_mb: int,
+    ) -> tuple[list[float], list[float], float]:
+        """
+        Run the probe (in adaptive mode) and every attempt of one direction on ``task``.
+
+        Returns:
+            Duration of each attempt, throughput samples and total elapsed time, probe included
+        """
         times_to_process = []
-        jitters = []
+        start_time = time.perf_counter()
+        with sample_throughput(progress, task) as throughput_samples:
+            # The probe runs on the same task, so its bytes count toward the measured speed
+            if adaptive:
+                self._adapt_size(test_type, progress, task, deadline, default_size_mb)
+
+            for _ in range(self.attempts):
+                # Check if we've exceeded the deadline before starting a new attempt
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
 
+                start = time.perf_counter()
+                func(progress, task, deadline)  # perform transfer with deadline
+                elapsed_time = time.perf_counter() - start
+                times_to_process.append(elapsed_time)
+
+                # Check if we've exceeded the deadline after the attempt
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+
+            elapsed = time.perf_counter() - start_time
+        return times_to_process, throughput_samples, elapsed
+
+    def _compute_network_speed(
+        self,
+        progress: Progress,
+        test_type: str,
+        func: Callable,
+        adaptive: bool = False,
+        default_size_mb: int = 30,
+    ) -> result.Result:
         self._init_connection()
 
         # Calculate deadline if timeout is set
         deadline = time.perf_counter() + self.timeout if self.timeout else None
 
         # Use indeterminate progress (total=None) when timeout is set since we don't know final size
+        size_to_process = self.download_size if test_type == "download" else self.upload_size
         total = None if self.timeout else size_to_process * self.attempts
         task = progress.add_task("", total=total)
+        self._tcp_info.pop(task, None)  # Task ids restart with every Progress
 
-        for _ in range(self.attempts):
-            # Check if we've exceeded the deadline before starting a new attempt
-            if deadline is not None and time.perf_counter() > deadline:
-                break
-
-            start = time.perf_counter()
-            func(progress, task, deadline)  # perform transfer with deadline
-            elapsed_time = time.perf_counter() - start
-            times_to_process.append(elapsed_time)
-
-            if len(times_to_process) > 1:
-                jitter = abs(times_to_process[-1] - times_to_process[-2])
-                jitters.append(jitter)
-
-            # Check if we've exceeded the deadline after the attempt
-            if deadline is not None and time.perf_counter() > deadline:
-                break
+        times_to_process, throughput_samples, elapsed = self._run_attempts(
+            test_type, func, progress, task, deadline, adaptive, default_size_mb
+        )
 
-        jitter = sum(jitters) / len(jitters) if jitters else (times_to_process[-1] if times_to_process else 0)
         http_latency = self._http_latency()
-        speed = progress.tasks[task].speed * 8 / 1_000_000 if progress.tasks[task].speed else 0
 
         # wait for ping to finish
         if not self.latency:
             self._wait()
 
-        return result.Result(speed=speed, jitter=jitter, latency=self.latency, http_latency=http_latency)
+        return self._build_result(progress, task, times_to_process, http_latency, throughput_samples, elapsed)
 
-    def download_speed(self, silent: bool, adaptive: bool = False, default_size_mb: int = 30) -> result.Result:
-        # Run adaptive sizing if enabled
-        if adaptive:
-            probe_speed = self._run_probe_test("download", silent=silent)
-            adaptive_size = self._calculate_adaptive_size(probe_speed, "download", default_size_mb)
-            self.download_size = adaptive_size
+    def _build_result(
+        self,
+        progress: Progress,
+        task: TaskID,
+        times_to_process: list[float],
+        http_latency: float,
+        throughput_samples: list[float],
+        elapsed: float,
+    ) -> result.Result:
+        # Every byte of the task (probe included) over the whole transfer time. Rich's own speed
+        # estimate only covers its last 1000 updates, a fraction of a second on fast links.
+        speed = progress.tasks[task].completed * 8 / (elapsed * 1_000_000) if elapsed > 0 else 0
+        throughput_variance, stalls = stability.throughput_stability(throughput_samples, THROUGHPUT_SAMPLE_INTERVAL)
+        retransmits, tcp_rtt, cwnd = self._tcp_stats(task)
+        return result.Result(
+            speed=speed,
+            jitter=_jitter(times_to_process),
+            latency=self.latency,
+            http_latency=http_latency,
+            throughput_variance=throughput_variance,
+            stalls=stalls,
+            retransmits=retransmits,
+            tcp_rtt=tcp_rtt,
+            cwnd=cwnd,
+        )
 
+    def download_speed(self, silent: bool, adaptive: bool = False, default_size_mb: int = 30) -> result.Result:
         with track_progress(silent=silent) as progress:
             download_result = self._compute_network_speed(
-                progress=progress, size_to_process=self.download_size, func=self._download
+                progress=progress,
+                test_type="download",
+                func=self._download,
+                adaptive=adaptive,
+                default_size_mb=default_size_mb,
             )
 
         return download_result
 
     def upload_speed(self, silent: bool, adaptive: bool = False, default_size_mb: int = 30) -> result.Result:
-        # Run adaptive sizing if enabled
-        if adaptive:
-            probe_speed = self._run_probe_test("upload", silent=silent)
-            adaptive_size = self._calculate_adaptive_size(probe_speed, "upload", default_size_mb)
-            self.upload_size = adaptive_size
-
         with track_progress(silent=silent) as progress:
             upload_result = self._compute_network_speed(
-                progress=progress, size_to_process=self.upload_size, func=self._parallel_upload
+                progress=progress,
+                test_type="upload",
+                func=self._parallel_upload,
+                adaptive=adaptive,
+                default_size_mb=default_size_mb,
             )
 
         return upload_result
 
-    @property
-    def metadata(self) -> metadata.Metadata:
-        return metadata.Metadata.model_validate(client().get(f"{self.url}/meta").json())
+    def _sample_loaded_latency(self, stop: threading.Event, samples: list[float]) -> None:
+        """Collect TCP handshake latencies until ``stop`` is set."""
+        while not stop.wait(LOADED_LATENCY_INTERVAL):
+            latency = _tcp_latency()
+            if latency is not None:
+                samples.append(latency)
 
-    def _run_probe_test(self, test_type: str, silent: bool = True) -> float | None:
-        """
-        Run a quick probe test to estimate bandwidth.
+    def _compute_bidirectional_speed(
+        self,
+        progress: Progress,
+        adaptive: bool = False,
+        default_download_mb: int = 30,
+        default_upload_mb: int = 30,
+    ) -> result.BidirectionalResult:
+        loaded_latencies: list[float] = []
 
-        Args:
-            test_type: "download" or "upload"
-            silent: Whether to suppress progress output
+        self._init_connection()
 
-        Returns:
-            Estimated speed in Mbps, or None if probe fails
-        """
-        probe_size = PROBE_SIZE_MB * CHUNK_SIZE
-        original_size = self.download_size if test_type == "download" else self.upload_size
+        deadline = time.perf_counter() + self.timeout if self.timeout else None
+        download_task = progress.add_task("", total=None if self.timeout else self.download_size * self.attempts)
+        upload_task = progress.add_task("", total=None if self.timeout else self.upload_size * self.attempts)
+
+        for task in (download_task, upload_task):
+            self._tcp_info.pop(task, None)  # Task ids restart with every Progress
+
+        # Sample latency in the background while both directions are saturated
+        stop_sampling = threading.Event()
+        sampler = threading.Thread(target=self._sample_loaded_latency, args=(stop_sampling, loaded_latencies))
+        sampler.start()
 
         try:
-            # Temporarily set size to probe size
-            if test_type == "download":
-                self.download_size = probe_size
-            else:
-                self.upload_size = probe_size
+            # Each direction probes and runs its attempts on its own thread against the shared deadline,
+            # so the faster one never waits for the slower one between attempts. Download streams on the
+            # shared client while upload uses its own connection set.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                download_future = executor.submit(
+                    self._run_attempts,
+                    "download",
+                    self._download,
+                    progress,
+                    download_task,
+                    deadline,
+                    adaptive,
+                    default_download_mb,
+                )
+                upload_future = executor.submit(
+                    self._run_attempts,
+                    "upload",
+                    self._parallel_upload,
+                    progress,
+                    upload_task,
+                    deadline,
+                    adaptive,
+                    default_upload_mb,
+                )
+                # Latency is only "loaded" while both directions are still running
+                concurrent.futures.wait(
+                    [download_future, upload_future], return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                stop_sampling.set()
+                download_times, download_samples, download_elapsed = download_future.result()
+                upload_times, upload_samples, upload_elapsed = upload_future.result()
+        finally:
+            stop_sampling.set()
+            sampler.join()
 
-            start_time = time.perf_counter()
+        http_latency = self._http_latency()
 
-            # Run single probe attempt with transient progress bar (disappears when done)
-            with track_progress_transient(silent=silent) as progress:
-                task = progress.add_task("🔍 Probing connection speed...", total=probe_size)
+        # wait for ping to finish
+        if not self.latency:
+            self._wait()
+
+        download_result = self._build_result(
+            progress, download_task, download_times, http_latency, download_samples, download_elapsed
+        )
+        upload_result = self._build_result(
+            progress, upload_task, upload_times, http_latency, upload_samples, upload_elapsed
+        )
+        return result.BidirectionalResult(
+            download=download_result,
+            upload=upload_result,
+            combined_speed=download_result.speed + upload_result.speed,
+            loaded_latency=sum(loaded_latencies) / len(loaded_latencies) if loaded_latencies else None,
+        )
+
+    def bidirectional_speed(
+        self, silent: bool, adaptive: bool = False, default_download_mb: int = 30, default_upload_mb: int = 30
+    ) -> result.BidirectionalResult:
+        """Saturate download and upload at the same time on separate connection sets."""
+        with track_progress(silent=silent) as progress:
+            bidirectional_result = self._compute_bidirectional_speed(
+                progress=progress,
+                adaptive=adaptive,
+                default_download_mb=default_download_mb,
+                default_upload_mb=default_upload_mb,
+            )
 
-                if test_type == "download":
-                    self._init_connection()
-                    self._download(progress, task)
-                else:
-                    self._init_connection()
-                    self._upload(progress, task)
+        return bidirectional_result
+
+    def _fetch_metadata(self) -> metadata.Metadata:
+        """Load /meta from the disk cache when fresh and valid, otherwise from the server."""
+        cache_path = metadata_cache_path()
+        if self.metadata_ttl > 0:
+            payload = _load_cached_metadata(cache_path, self.metadata_ttl)
+            if payload is not None:
+                # An entry left by another version or writer may no longer validate: refetch it
+                with contextlib.suppress(pydantic.ValidationError):
+                    return metadata.Metadata.model_validate(payload)
+
+        payload = client().get(f"{self.url}/meta").json()
+        fetched = metadata.Metadata.model_validate(payload)
+        if self.metadata_ttl > 0:
+            _store_cached_metadata(cache_path, payload)
+        return fetched
+
+    def _prefetch_metadata(self) -> None:
+        # Errors are left for the ``metadata`` property to raise on the caller's thread
+        with contextlib.suppress(httpx.HTTPError, ValueError):
+            self._metadata = self._fetch_metadata()
 
-                elapsed_time = time.perf_counter() - start_time
+    @property
+    def metadata(self) -> metadata.Metadata:
+        """Metadata for this run, fetched at most once."""
+        if self._metadata_thread.is_alive():
+            self._metadata_thread.join()
+        if self._metadata is None:
+            self._metadata = self._fetch_metadata()
+        return self._metadata
+
+    def _run_probe_test(
+        self, test_type: str, progress: Progress, task: TaskID, deadline: float | None = None
+    ) -> float | None:
+        """
+        Estimate bandwidth from the start of a transfer, stopping as soon as the estimate settles.
 
-                # Check if probe timed out
-                if elapsed_time > PROBE_TIMEOUT_SECONDS:
-                    return None
+        The probe uses the same transfer function (and therefore the same concurrency) as the
+        main test and reports into the main test's progress task.
 
-                # Calculate speed in Mbps
-                speed_mbps = (probe_size * 8) / (elapsed_time * 1_000_000)
-                return speed_mbps
+        Args:
+            test_type: "download" or "upload"
+            progress: Progress tracking the main test
+            task: Task of the main test the probe bytes are added to
+            deadline: Overall test deadline, the probe never runs past it
 
-        except Exception:
-            return None
+        Returns:
+            Estimated speed in Mbps, or None if probe fails
+        """
+        probe_deadline = time.perf_counter() + PROBE_TIMEOUT_SECONDS
+        if deadline is not None:
+            probe_deadline = min(probe_deadline, deadline)
+        stop = threading.Event()
+
+        if test_type == "download":
+            func = self._download
+            original_size = self.download_size
+            self.download_size = MAX_TEST_SIZE_MB * CHUNK_SIZE
+        else:
+            func = self._parallel_upload
+            original_size = self.upload_size
+            self.upload_size = MAX_TEST_SIZE_MB * CHUNK_SIZE
+
+        errors: list[Exception] = []
+
+        def transfer() -> None:
+            try:
+                func(progress, task, probe_deadline, stop)
+            except Exception as e:
+                errors.append(e)
+
+        transfer_thread = threading.Thread(target=transfer, daemon=True)
+        samples = [(time.perf_counter(), progress.tasks[task].completed)]
+        transfer_thread.start()
+
+        estimate = None
+        try:
+            while transfer_thread.is_alive():
+                transfer_thread.join(PROBE_SAMPLE_INTERVAL)
+                samples.append((time.perf_counter(), progress.tasks[task].completed))
+                estimate, stable = _probe_estimate(samples)
+                if stable:
+                    break
         finally:
-            # Restore original size
+            stop.set()
+            transfer_thread.join()
             if test_type == "download":
                 self.download_size = original_size
             else:
                 self.upload_size = original_size
 
+        return None if errors else estimate
+
+    def _adapt_size(
+        self, test_type: str, progress: Progress, task: TaskID, deadline: float | None, default_size_mb: int
+    ) -> None:
+        """Probe the connection on ``task`` and size the remaining attempts from the estimate."""
+        probe_speed = self._run_probe_test(test_type, progress, task, deadline)
+        adaptive_size = self._calculate_adaptive_size(probe_speed, test_type, default_size_mb)
+        if test_type == "download":
+            self.download_size = adaptive_size
+        else:
+            self.upload_size = adaptive_size
+
+        if progress.tasks[task].total is not None:
+            progress.update(task, total=progress.tasks[task].completed + adaptive_size * self.attempts)
+
     def _calculate_adaptive_size(self, probe_speed: float | None, test_type: str, default_size_mb: int) -> int:
         """
         Calculate optimal test size based on probe results.
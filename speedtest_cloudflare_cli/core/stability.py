@@ -0,0 +1,88 @@
+"""
+Throughput stability and TCP-level statistics gathered while a transfer is running.
+"""
+
+from __future__ import annotations
+
+import itertools
+import socket
+import statistics
+import struct
+from dataclasses import dataclass
+
+import httpx
+
+# Leading part of Linux ``struct tcp_info``: 8 one-byte fields followed by 32-bit counters,
+# up to and including ``tcpi_total_retrans``.
+TCP_INFO_FORMAT = "8B24I"
+TCP_INFO_SIZE = struct.calcsize(TCP_INFO_FORMAT)
+TCP_INFO_RTT = 8 + 15  # tcpi_rtt, in microseconds
+TCP_INFO_SND_CWND = 8 + 18  # tcpi_snd_cwnd, in segments
+TCP_INFO_TOTAL_RETRANS = 8 + 23  # tcpi_total_retrans
+
+
+@dataclass
+class TcpInfo:
+    connection: tuple
+    retransmits: int
+    rtt: float  # Smoothed RTT in ms
+    cwnd: int  # Congestion window in segments
+
+
+def read_tcp_info(response: httpx.Response) -> TcpInfo | None:
+    """Read TCP_INFO from the socket carrying ``response``; None where the platform does not expose it."""
+    tcp_info_option = getattr(socket, "TCP_INFO", None)
+    network_stream = response.extensions.get("network_stream")
+    if tcp_info_option is None or network_stream is None:
+        return None
+
+    sock = network_stream.get_extra_info("socket")
+    if sock is None:
+        return None
+
+    try:
+        raw = sock.getsockopt(socket.IPPROTO_TCP, tcp_info_option, TCP_INFO_SIZE)
+        connection = sock.getsockname()
+    except OSError:
+        return None
+    if len(raw) < TCP_INFO_SIZE:
+        return None
+
+    fields = struct.unpack(TCP_INFO_FORMAT, raw[:TCP_INFO_SIZE])
+    return TcpInfo(
+        connection=connection,
+        retransmits=fields[TCP_INFO_TOTAL_RETRANS],
+        rtt=fields[TCP_INFO_RTT] / 1000,
+        cwnd=fields[TCP_INFO_SND_CWND],
+    )
+
+
+def summarize_tcp_info(infos: list[TcpInfo]) -> tuple[int | None, float | None, float | None]:
+    """
+    Aggregate the last snapshot of each connection.
+
+    Returns:
+        Total retransmits, mean RTT in ms and mean congestion window, or Nones without snapshots
+    """
+    if not infos:
+        return None, None, None
+    return (
+        sum(info.retransmits for info in infos),
+        statistics.fmean(info.rtt for info in infos),
+        statistics.fmean(info.cwnd for info in infos),
+    )
+
+
+def throughput_stability(samples: list[float], interval: float) -> tuple[float | None, int]:
+    """
+    Analyse cumulative byte counts taken every ``interval`` seconds.
+
+    Returns:
+        Variance of the per-interval throughput in Mbps² (None with fewer than two intervals),
+        and the number of intervals in which no data moved at all
+    """
+    deltas = [current - previous for previous, current in itertools.pairwise(samples)]
+    speeds = [delta * 8 / (interval * 1_000_000) for delta in deltas]
+    variance = statistics.pvariance(speeds) if len(speeds) > 1 else None
+    stalls = sum(1 for delta in deltas if delta == 0)
+    return variance, stalls
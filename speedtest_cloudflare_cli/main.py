@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+import datetime
 import json as _json
 import sys
 from importlib import metadata as pkg_metadata
@@ -11,8 +12,9 @@ import rich.json
 import rich.table
 import rich_click as click
 
+from speedtest_cloudflare_cli.core import compare as compare_results
 from speedtest_cloudflare_cli.core import dashboard, speedtest
-from speedtest_cloudflare_cli.models import metadata, result
+from speedtest_cloudflare_cli.models import comparison, metadata, result
 
 DOWNLOAD_SIZE = 30  # 30MB
 UPLOAD_SIZE = 30  # 30MB
@@ -21,7 +23,10 @@ SPEEDTEST_URL = "https://speed.cloudflare.com"
 
 
 def display_results(
-    download_result: result.Result | None, upload_result: result.Result | None, metadata: metadata.Metadata
+    download_result: result.Result | None,
+    upload_result: result.Result | None,
+    metadata: metadata.Metadata,
+    bidirectional_result: result.BidirectionalResult | None = None,
 ) -> None:
     table = rich.table.Table(title="Speedtest Results", show_header=True, border_style="blue", title_style="bold")
     table.add_column("Metric", style="bold green")
@@ -33,6 +38,8 @@ def display_results(
         result_attr = getattr(result, attr, None)
         if isinstance(result_attr, float):
             return f"{result_attr:.2f}"
+        if isinstance(result_attr, int):
+            return str(result_attr)
         return "N/A"
 
     # Speed test results
@@ -47,6 +54,27 @@ def display_results(
         safe_value(upload_result, "http_latency") + " ms",
     )
 
+    # Stability under sustained load
+    table.add_section()
+    table.add_row(
+        "Throughput Variance",
+        safe_value(download_result, "throughput_variance") + " Mbps²",
+        safe_value(upload_result, "throughput_variance") + " Mbps²",
+    )
+    table.add_row("Stalls", safe_value(download_result, "stalls") + " s", safe_value(upload_result, "stalls") + " s")
+    table.add_row(
+        "TCP Retransmits", safe_value(download_result, "retransmits"), safe_value(upload_result, "retransmits")
+    )
+    table.add_row(
+        "TCP RTT", safe_value(download_result, "tcp_rtt") + " ms", safe_value(upload_result, "tcp_rtt") + " ms"
+    )
+    table.add_row("TCP CWND", safe_value(download_result, "cwnd") + " seg", safe_value(upload_result, "cwnd") + " seg")
+
+    if bidirectional_result:
+        table.add_section()
+        table.add_row("Combined Speed", safe_value(bidirectional_result, "combined_speed") + " Mbps", "")
+        table.add_row("Loaded Latency", safe_value(bidirectional_result, "loaded_latency") + " ms", "")
+
     # Metadata information
     table_metadata = rich.table.Table(title="Metadata", show_header=True, title_style="bold")
     table_metadata.add_column("Metric", style="bold green")
@@ -69,10 +97,99 @@ def display_results(
     rich.print(table_metadata)
 
 
-@click.command()
+def run_tests(
+    speedtester: speedtest.SpeedTest,
+    *,
+    download: bool,
+    upload: bool,
+    bidirectional: bool,
+    silent: bool,
+    adaptive: bool,
+    download_size: int,
+    upload_size: int,
+) -> tuple[result.Result | None, result.Result | None, result.BidirectionalResult | None]:
+    """Run the selected tests and return the download, upload and bidirectional results."""
+    if bidirectional:
+        bidirectional_result = speedtester.bidirectional_speed(
+            silent=silent, adaptive=adaptive, default_download_mb=download_size, default_upload_mb=upload_size
+        )
+        return bidirectional_result.download, bidirectional_result.upload, bidirectional_result
+
+    download_result = None
+    upload_result = None
+    if download:
+        download_result = speedtester.download_speed(silent=silent, adaptive=adaptive, default_size_mb=download_size)
+    if upload:
+        upload_result = speedtester.upload_speed(silent=silent, adaptive=adaptive, default_size_mb=upload_size)
+    if not download and not upload:
+        download_result = speedtester.download_speed(silent=silent, adaptive=adaptive, default_size_mb=download_size)
+        upload_result = speedtester.upload_speed(silent=silent, adaptive=adaptive, default_size_mb=upload_size)
+    return download_result, upload_result, None
+
+
+def display_comparison(
+    result_comparison: compare_results.Comparison,
+    summaries: dict[str, list[comparison.GroupSummary]],
+    regressions: list[comparison.RegressionCheck] | None,
+) -> None:
+    unit = "ms" if result_comparison.metric == "latency" else "Mbps"
+    rich.print(
+        f"[bold]{result_comparison.runs}[/bold] runs compared on [bold]{result_comparison.metric}[/bold]"
+        f" ({result_comparison.skipped} skipped)"
+    )
+
+    for grouping, group_summaries in summaries.items():
+        title = "Overall" if grouping == compare_results.OVERALL else f"By {grouping}"
+        table = rich.table.Table(title=title, show_header=True, border_style="blue", title_style="bold")
+        table.add_column(grouping.capitalize(), style="bold green")
+        table.add_column("Runs", justify="right")
+        table.add_column(f"Median ({unit})", style="bold yellow", justify="right")
+        table.add_column(f"P5 ({unit})", justify="right")
+        table.add_column(f"P95 ({unit})", justify="right")
+        table.add_column(f"Trend ({unit}/day)", style="magenta", justify="right")
+        for summary in group_summaries:
+            table.add_row(
+                summary.key,
+                str(summary.count),
+                f"{summary.median:.2f}",
+                f"{summary.p5:.2f}",
+                f"{summary.p95:.2f}",
+                f"{summary.trend:+.2f}" if summary.trend is not None else "N/A",
+            )
+        rich.print(table)
+
+    if regressions is None:
+        return
+    table = rich.table.Table(title="Regressions", show_header=True, border_style="blue", title_style="bold")
+    table.add_column("Group", style="bold green")
+    table.add_column("Key", style="bold green")
+    table.add_column("Runs", justify="right")
+    table.add_column(f"Before ({unit})", justify="right")
+    table.add_column(f"After ({unit})", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("p-value", justify="right")
+    table.add_column("Adjusted", justify="right")
+    table.add_column("Regression")
+    for check in regressions:
+        table.add_row(
+            check.group,
+            check.key,
+            f"{check.baseline_count}/{check.current_count}",
+            f"{check.baseline_median:.2f}",
+            f"{check.current_median:.2f}",
+            f"{check.change:+.1%}",
+            f"{check.p_value:.4f}",
+            f"{check.adjusted_p_value:.4f}",
+            "[bold red]yes[/bold red]" if check.regression else "no",
+        )
+    rich.print(table)
+
+
+@click.group(invoke_without_command=True)
 @click.version_option(version=pkg_metadata.version("speedtest-cloudflare-cli"), prog_name="speedtest-cli")
 @click.option("--upload", "-u", is_flag=True, help="Run upload test")
 @click.option("--download", "-d", is_flag=True, help="Run download test")
+@click.option("--bidirectional", "-b", is_flag=True, help="Run download and upload simultaneously (full-duplex)")
 @click.option("--download_size", "-ds", type=int, default=DOWNLOAD_SIZE, help="Download size in MB")
 @click.option("--upload_size", "-us", type=int, default=UPLOAD_SIZE, help="Upload size in MB")
 @click.option("--attempts", "-a", type=int, default=3, help="Number of attempts")
@@ -86,10 +203,20 @@ def display_results(
     default=True,
     help="Enable adaptive test sizing based on connection speed (default: enabled)",
 )
+@click.option(
+    "--metadata-ttl",
+    type=float,
+    default=speedtest.METADATA_CACHE_TTL,
+    help="Seconds to reuse cached connection metadata between runs, for scheduled runs on a fixed network"
+    " (default: 0, disabled)",
+)
+@click.pass_context
 def main(
+    ctx: click.Context,
     *,
     download: bool,
     upload: bool,
+    bidirectional: bool,
     download_size: int,
     upload_size: int,
     attempts: int,
@@ -99,7 +226,13 @@ def main(
     json_output: str,
     web_view: bool,
     adaptive: bool,
+    metadata_ttl: float,
 ) -> None:
+    if ctx.invoked_subcommand is not None:
+        return
+    if bidirectional and (download or upload):
+        ctx.fail("--bidirectional runs both directions and cannot be combined with --download or --upload")
+
     # If user specifies manual size, disable adaptive mode
     user_specified_size = download_size != DOWNLOAD_SIZE or upload_size != UPLOAD_SIZE
     if user_specified_size and adaptive:
@@ -115,28 +248,41 @@ def main(
         upload_size=upload_size_bytes,
         attempts=attempts,
         timeout=timeout,
+        metadata_ttl=metadata_ttl,
+    )
+    download_result, upload_result, bidirectional_result = run_tests(
+        speedtester,
+        download=download,
+        upload=upload,
+        bidirectional=bidirectional,
+        silent=silent,
+        adaptive=adaptive,
+        download_size=download_size,
+        upload_size=upload_size,
     )
-    download_result = None
-    upload_result = None
-    if download:
-        download_result = speedtester.download_speed(silent=silent, adaptive=adaptive, default_size_mb=download_size)
-    if upload:
-        upload_result = speedtester.upload_speed(silent=silent, adaptive=adaptive, default_size_mb=upload_size)
-    if not download and not upload:
-        download_result = speedtester.download_speed(silent=silent, adaptive=adaptive, default_size_mb=download_size)
-        upload_result = speedtester.upload_speed(silent=silent, adaptive=adaptive, default_size_mb=upload_size)
 
+    run_metadata = speedtester.metadata
     results = {
         "download": download_result.__dict__ if download_result else None,
         "upload": upload_result.__dict__ if upload_result else None,
-        "metadata": speedtester.metadata.__dict__,
-        "timestamp": speedtester.metadata.date.isoformat(),
+        "metadata": run_metadata.__dict__,
+        "timestamp": run_metadata.date.isoformat(),
     }
+    if bidirectional_result:
+        results["bidirectional"] = {
+            "combined_speed": bidirectional_result.combined_speed,
+            "loaded_latency": bidirectional_result.loaded_latency,
+        }
 
     if json:
         rich.print(results)
     else:
-        display_results(download_result=download_result, upload_result=upload_result, metadata=speedtester.metadata)
+        display_results(
+            download_result=download_result,
+            upload_result=upload_result,
+            metadata=run_metadata,
+            bidirectional_result=bidirectional_result,
+        )
     if json_output:
         json_path = Path(json_output)
         with json_path.open("w+") as fp:
@@ -145,5 +291,86 @@ def main(
         dashboard.webbrowser_open_dashboard(data=results)
 
 
+@main.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--metric",
+    type=click.Choice(list(compare_results.METRICS)),
+    default="download",
+    help="Metric to aggregate (default: download)",
+)
+@click.option(
+    "--by",
+    "groupings",
+    type=click.Choice(compare_results.GROUPINGS),
+    multiple=True,
+    help="Group results by colo, asn or hour of day (repeatable, default: all)",
+)
+@click.option(
+    "--split",
+    type=click.DateTime(formats=["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S"]),
+    default=None,
+    help="Check for regressions between runs before and after this date (UTC)",
+)
+@click.option(
+    "--window",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Days on each side of --split to compare (default: all)",
+)
+@click.option(
+    "--alpha",
+    type=float,
+    default=compare_results.DEFAULT_ALPHA,
+    help="Family-wise significance level for regressions, Holm-corrected across groups (default: 0.05)",
+)
+@click.option(
+    "--min-change",
+    type=click.FloatRange(min=0),
+    default=compare_results.DEFAULT_MIN_CHANGE,
+    help="Minimum relative change of the median to flag a regression (default: 0.05, i.e. 5%)",
+)
+@click.option("--json", is_flag=True, help="Output the report in JSON format")
+def compare(
+    *,
+    paths: tuple[Path, ...],
+    metric: str,
+    groupings: tuple[str, ...],
+    split: datetime.datetime | None,
+    window: float | None,
+    alpha: float,
+    min_change: float,
+    json: bool,
+) -> None:
+    """Aggregate stored results (JSON files, JSON Lines files or directories of them) and flag regressions."""
+    groupings = groupings or compare_results.GROUPINGS
+    result_comparison = compare_results.load(paths, metric=metric)
+
+    summaries = {grouping: result_comparison.summaries(grouping) for grouping in (compare_results.OVERALL, *groupings)}
+    regressions = None
+    if split is not None:
+        regressions = result_comparison.regressions(
+            split=split.replace(tzinfo=datetime.UTC),
+            window=datetime.timedelta(days=window) if window is not None else None,
+            alpha=alpha,
+            groupings=groupings,
+            min_change=min_change,
+        )
+
+    if json:
+        report = {
+            "metric": metric,
+            "runs": result_comparison.runs,
+            "skipped": result_comparison.skipped,
+            "groups": {
+                grouping: [s.__dict__ for s in group_summaries] for grouping, group_summaries in summaries.items()
+            },
+            "regressions": [check.__dict__ for check in regressions] if regressions is not None else None,
+        }
+        rich.print_json(data=report)
+    else:
+        display_comparison(result_comparison, summaries, regressions)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass
+class GroupSummary:
+    key: str
+    count: int
+    median: float
+    p5: float
+    p95: float
+    trend: float | None  # Change of the metric per day
+
+
+@dataclass
+class RegressionCheck:
+    group: str
+    key: str
+    baseline_count: int
+    current_count: int
+    baseline_median: float
+    current_median: float
+    change: float  # Relative change of the median, current vs baseline
+    p_value: float
+    adjusted_p_value: float  # Holm-adjusted across every check of the comparison
+    regression: bool
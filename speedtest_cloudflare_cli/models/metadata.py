@@ -1,6 +1,6 @@
 import datetime
 
-from pydantic import BaseModel, Field, computed_field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_validator
 
 
 class Metadata(BaseModel):
@@ -17,6 +17,8 @@ class Metadata(BaseModel):
     latitude: str
     longitude: str
 
+    _created_at: datetime.datetime = PrivateAttr(default_factory=lambda: datetime.datetime.now(datetime.UTC))
+
     @field_validator("colo", mode="before")
     @classmethod
     def extract_colo_iata(cls, v):
@@ -33,4 +35,4 @@ class Metadata(BaseModel):
     @computed_field
     @property
     def date(self) -> datetime.datetime:
-        return datetime.datetime.now(datetime.UTC)
+        return self._created_at
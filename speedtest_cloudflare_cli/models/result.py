@@ -9,3 +9,16 @@ class Result:
     jitter: float | None
     latency: float | str | None
     http_latency: float | None
+    throughput_variance: float | None = None  # Variance of per-second throughput in Mbps²
+    stalls: int | None = None  # Seconds in which no data moved
+    retransmits: int | None = None  # TCP retransmits over all transfer connections
+    tcp_rtt: float | None = None  # Mean smoothed TCP RTT in ms
+    cwnd: float | None = None  # Mean TCP congestion window in segments
+
+
+@dataclass
+class BidirectionalResult:
+    download: Result
+    upload: Result
+    combined_speed: float | None
+    loaded_latency: float | None
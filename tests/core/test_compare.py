@@ -0,0 +1,139 @@
+import datetime
+import json
+import random
+
+import pytest
+
+from speedtest_cloudflare_cli.core import compare
+
+START = datetime.datetime(2026, 9, 1, tzinfo=datetime.UTC)
+
+
+def make_record(speed, timestamp, colo="CDG", asn=64496):
+    return {
+        "download": {"speed": speed, "jitter": 1.0, "latency": 10.0, "http_latency": 20.0},
+        "upload": None,
+        "metadata": {"colo": colo, "asn": asn},
+        "timestamp": timestamp.isoformat(),
+    }
+
+
+def test_percentile():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert compare.percentile(values, 0.5) == 3.0
+    assert compare.percentile(values, 0.05) == pytest.approx(1.2)
+    assert compare.percentile(values, 0.95) == pytest.approx(4.8)
+    assert compare.percentile([7.0], 0.95) == 7.0
+
+
+def test_mann_whitney_u():
+    # Fully separated samples of 10: U = 0, asymptotic p-value with continuity correction
+    baseline = [float(v) for v in range(11, 21)]
+    current = [float(v) for v in range(1, 11)]
+    assert compare.mann_whitney_u(baseline, current) == pytest.approx(0.000183, rel=1e-2)
+
+    assert compare.mann_whitney_u([1.0, 2.0, 3.0], [1.0, 2.0, 3.0]) == pytest.approx(1.0)
+    assert compare.mann_whitney_u([5.0] * 4, [5.0] * 4) == 1.0
+
+
+def test_holm():
+    assert compare.holm([0.01, 0.04, 0.03, 0.5]) == pytest.approx([0.04, 0.09, 0.09, 0.5])
+    assert compare.holm([0.6, 0.9]) == [1.0, 1.0]
+    assert compare.holm([]) == []
+
+
+def test_iter_records(tmp_path):
+    store = tmp_path / "store"
+    (store / "nested").mkdir(parents=True)
+    (store / "single.json").write_text(json.dumps(make_record(100.0, START)))
+    (store / "nested" / "runs.jsonl").write_text(
+        "\n".join(json.dumps(make_record(speed, START)) for speed in (1.0, 2.0)) + "\n\n{broken\n"
+    )
+    (store / "notes.txt").write_text("ignored")
+    (store / "binary.json").write_bytes(b"\xff\xfe\x00garbage")
+
+    records = list(compare.iter_records([store]))
+
+    assert [record["download"]["speed"] for record in records if record] == [1.0, 2.0, 100.0]
+    assert records.count(None) == 2
+
+
+def test_comparison_summaries():
+    result_comparison = compare.Comparison("download")
+    for day in range(10):
+        result_comparison.add(make_record(100.0 + day, START + datetime.timedelta(days=day), colo="CDG"))
+    result_comparison.add(make_record(50.0, START, colo="AMS"))
+    result_comparison.add(make_record("N/A", START))
+    result_comparison.add({"download": {"speed": 10.0}})
+    result_comparison.add(None)
+
+    assert result_comparison.runs == 11
+    assert result_comparison.skipped == 3
+
+    ams, cdg = result_comparison.summaries("colo")
+    assert (ams.key, ams.count, ams.median, ams.trend) == ("AMS", 1, 50.0, None)
+    assert (cdg.key, cdg.count, cdg.median) == ("CDG", 10, 104.5)
+    assert cdg.trend == pytest.approx(1.0)  # +1 Mbps per day
+    assert [summary.key for summary in result_comparison.summaries("hour")] == ["00:00"]
+
+
+def test_comparison_latency_uses_upload_when_download_missing():
+    result_comparison = compare.Comparison("latency")
+    result_comparison.add({"upload": {"latency": 12.0}, "metadata": {}, "timestamp": START.isoformat()})
+
+    (summary,) = result_comparison.summaries(compare.OVERALL)
+    assert summary.median == 12.0
+
+
+def test_comparison_regressions():
+    result_comparison = compare.Comparison("download")
+    split = START + datetime.timedelta(days=20)
+    for hour in range(40 * 24):
+        timestamp = START + datetime.timedelta(hours=hour)
+        after = timestamp >= split
+        result_comparison.add(make_record(200.0 + hour % 7 - (50 if after else 0), timestamp, colo="CDG"))
+        result_comparison.add(make_record(300.0 + hour % 5, timestamp, colo="AMS"))
+
+    checks = result_comparison.regressions(split, window=datetime.timedelta(days=7), groupings=["colo"])
+
+    by_key = {(check.group, check.key): check for check in checks}
+    assert set(by_key) == {("all", "all"), ("colo", "AMS"), ("colo", "CDG")}
+    assert by_key["colo", "CDG"].regression
+    assert by_key["colo", "CDG"].baseline_count == 7 * 24
+    assert by_key["colo", "CDG"].change == pytest.approx(-0.25, abs=0.01)
+    assert not by_key["colo", "AMS"].regression
+
+    # Too few runs in a window: no verdict
+    assert result_comparison.regressions(split, window=datetime.timedelta(hours=2)) == []
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_comparison_regressions_null_data(seed):
+    # Every run drawn from the same distribution: ~30 groups tested, none should be flagged
+    rng = random.Random(seed)  # noqa: S311
+    result_comparison = compare.Comparison("download")
+    for hour in range(60 * 24):
+        timestamp = START + datetime.timedelta(hours=hour)
+        for colo in ("AMS", "CDG", "FRA"):
+            result_comparison.add(make_record(rng.gauss(200.0, 30.0), timestamp, colo=colo))
+
+    checks = result_comparison.regressions(START + datetime.timedelta(days=30))
+
+    assert len(checks) == 1 + 3 + 1 + 24
+    assert not [check for check in checks if check.regression]
+
+
+def test_comparison_regressions_min_change():
+    # A 2% drop over many runs is significant, but smaller than the default minimum change
+    result_comparison = compare.Comparison("download")
+    split = START + datetime.timedelta(days=20)
+    for hour in range(40 * 24):
+        timestamp = START + datetime.timedelta(hours=hour)
+        result_comparison.add(make_record(200.0 + hour % 7 - (4 if timestamp >= split else 0), timestamp))
+
+    (check,) = result_comparison.regressions(split, groupings=[])
+    assert check.adjusted_p_value < compare.DEFAULT_ALPHA
+    assert not check.regression
+
+    (check,) = result_comparison.regressions(split, groupings=[], min_change=0.01)
+    assert check.regression
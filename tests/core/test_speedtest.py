@@ -1,10 +1,13 @@
+import threading
 import unittest
 import unittest.mock
 
 import pytest
 from pytest_mock import MockerFixture
 
-from speedtest_cloudflare_cli.core import speedtest
+from speedtest_cloudflare_cli.core import speedtest, stability
+
+REAL_THREAD = threading.Thread
 
 
 @pytest.fixture
@@ -18,10 +21,11 @@ def my_speedtest_object(mocker: MockerFixture) -> speedtest.SpeedTest:
 def test_init(mock_thread):
     # Test the initialization of the SpeedTest object
     my_speedtest = speedtest.SpeedTest("my_url", 1024, 1024, 3)
-    mock_thread.assert_called_once()
-    mock_thread.assert_called_with(target=my_speedtest.ping, daemon=True)
-    mock_thread.return_value.start.assert_called_once()
-    mock_thread.return_value.start.assert_called_with()
+    assert mock_thread.call_args_list == [
+        unittest.mock.call(target=my_speedtest.ping, daemon=True),
+        unittest.mock.call(target=my_speedtest._prefetch_metadata, daemon=True),
+    ]
+    assert mock_thread.return_value.start.call_count == 2
     assert my_speedtest.url == "my_url"
     assert my_speedtest.download_size == 1024
     assert my_speedtest.upload_size == 1024
@@ -47,6 +51,337 @@ def test_wait(my_speedtest_object, mocker: MockerFixture):
     my_speedtest_object._ping_thread.join.assert_not_called()
 
 
+META_PAYLOAD = {
+    "hostname": "speed.cloudflare.com",
+    "clientIp": "192.0.2.1",
+    "httpProtocol": "HTTP/2",
+    "asn": 64496,
+    "asOrganization": "Example ISP",
+    "colo": {"iata": "CDG"},
+    "country": "FR",
+    "latitude": "48.85",
+    "longitude": "2.35",
+}
+
+
+def test_metadata_fetched_once(my_speedtest_object, mocker: MockerFixture, tmp_path):
+    mocker.patch.dict("os.environ", {"XDG_CACHE_HOME": str(tmp_path)})
+    my_speedtest_object._metadata_thread.is_alive.return_value = False
+    mock_client = mocker.patch("speedtest_cloudflare_cli.core.speedtest.client")
+    mock_client.return_value.get.return_value.json.return_value = META_PAYLOAD
+
+    first = my_speedtest_object.metadata
+    second = my_speedtest_object.metadata
+
+    mock_client.return_value.get.assert_called_once_with("my_url/meta")
+    assert first is second
+    assert first.colo == "CDG"
+    assert first.date == second.date
+
+
+def test_metadata_disk_cache(my_speedtest_object, mocker: MockerFixture, tmp_path):
+    mocker.patch.dict("os.environ", {"XDG_CACHE_HOME": str(tmp_path)})
+    my_speedtest_object.metadata_ttl = 600
+    mock_client = mocker.patch("speedtest_cloudflare_cli.core.speedtest.client")
+    mock_client.return_value.get.return_value.json.return_value = META_PAYLOAD
+
+    my_speedtest_object._fetch_metadata()
+    assert speedtest.metadata_cache_path().exists()
+
+    # A fresh cache entry is served without hitting the network
+    mock_client.reset_mock()
+    assert my_speedtest_object._fetch_metadata().isp == "Example ISP"
+    mock_client.return_value.get.assert_not_called()
+
+    # An expired entry triggers a new request
+    mocker.patch("time.time", return_value=speedtest.time.time() + 601)
+    my_speedtest_object._fetch_metadata()
+    mock_client.return_value.get.assert_called_once_with("my_url/meta")
+
+
+def test_metadata_invalid_cache_entry(my_speedtest_object, mocker: MockerFixture, tmp_path):
+    mocker.patch.dict("os.environ", {"XDG_CACHE_HOME": str(tmp_path)})
+    my_speedtest_object.metadata_ttl = 900
+    my_speedtest_object._metadata_thread.is_alive.return_value = False
+    speedtest._store_cached_metadata(speedtest.metadata_cache_path(), {"hostname": "h"})
+    mock_client = mocker.patch("speedtest_cloudflare_cli.core.speedtest.client")
+    mock_client.return_value.get.return_value.json.return_value = META_PAYLOAD
+
+    # A fresh entry that no longer validates is a cache miss, and gets overwritten
+    assert my_speedtest_object.metadata.colo == "CDG"
+    mock_client.return_value.get.assert_called_once_with("my_url/meta")
+    assert speedtest._load_cached_metadata(speedtest.metadata_cache_path(), 900) == META_PAYLOAD
+
+
+def test_metadata_cache_disabled_by_default(my_speedtest_object, mocker: MockerFixture, tmp_path):
+    mocker.patch.dict("os.environ", {"XDG_CACHE_HOME": str(tmp_path)})
+    mock_client = mocker.patch("speedtest_cloudflare_cli.core.speedtest.client")
+    mock_client.return_value.get.return_value.json.return_value = META_PAYLOAD
+    assert my_speedtest_object.metadata_ttl == 0
+
+    my_speedtest_object._fetch_metadata()
+    my_speedtest_object._fetch_metadata()
+
+    assert mock_client.return_value.get.call_count == 2
+    assert not speedtest.metadata_cache_path().exists()
+
+
+def test_jitter():
+    assert speedtest._jitter([]) == 0
+    assert speedtest._jitter([2.0]) == 2.0
+    assert speedtest._jitter([1.0, 2.0, 4.0]) == pytest.approx(1.5)
+
+
+def test_bidirectional_speed(my_speedtest_object, mocker: MockerFixture):
+    # The fixture mocks threads; the transfers and the latency sampler need real ones
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "LOADED_LATENCY_INTERVAL", 0.001)
+    mocker.patch.object(speedtest, "_tcp_latency", return_value=42.0)
+    mocker.patch.object(my_speedtest_object, "_init_connection")
+    mocker.patch.object(my_speedtest_object, "_http_latency", return_value=10.0)
+    my_speedtest_object.latency = 5.0
+    my_speedtest_object.timeout = None
+
+    def fake_transfer(progress, task, deadline):
+        for _ in range(5):
+            speedtest.time.sleep(0.01)
+            progress.update(task, advance=1_000_000)
+
+    mocker.patch.object(my_speedtest_object, "_download", side_effect=fake_transfer)
+    mocker.patch.object(my_speedtest_object, "_parallel_upload", side_effect=fake_transfer)
+
+    bidirectional_result = my_speedtest_object.bidirectional_speed(silent=True)
+
+    assert my_speedtest_object._download.call_count == 3
+    assert my_speedtest_object._parallel_upload.call_count == 3
+    assert bidirectional_result.download.speed > 0
+    assert bidirectional_result.upload.speed > 0
+    assert bidirectional_result.combined_speed == pytest.approx(
+        bidirectional_result.download.speed + bidirectional_result.upload.speed
+    )
+    assert bidirectional_result.loaded_latency == 42.0
+    assert bidirectional_result.download.http_latency == 10.0
+    assert bidirectional_result.download.stalls == 0
+
+
+def test_compute_network_speed_counts_every_byte(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch.object(my_speedtest_object, "_init_connection")
+    mocker.patch.object(my_speedtest_object, "_http_latency", return_value=10.0)
+    my_speedtest_object.latency = 5.0
+    my_speedtest_object.timeout = None
+    pause = 0.05
+
+    # Bursts of TRANSFER_BLOCK_SIZE updates: far more than the 1000 updates rich keeps per task
+    def fake_transfer(progress, task, deadline):
+        for _ in range(3):
+            speedtest.time.sleep(pause)
+            for _ in range(500):
+                progress.update(task, advance=speedtest.TRANSFER_BLOCK_SIZE)
+
+    mocker.patch.object(my_speedtest_object, "_download", side_effect=fake_transfer)
+
+    start = speedtest.time.perf_counter()
+    with speedtest.track_progress(silent=True) as progress:
+        download_result = my_speedtest_object._compute_network_speed(
+            progress, "download", my_speedtest_object._download
+        )
+    elapsed = speedtest.time.perf_counter() - start
+
+    megabits = 3 * 3 * 500 * speedtest.TRANSFER_BLOCK_SIZE * 8 / 1_000_000
+    assert megabits / elapsed <= download_result.speed <= megabits / (3 * 3 * pause)
+
+
+def paced_transfer(step: int, count: int, delay: float):
+    """Fake transfer advancing its task by ``step`` bytes every ``delay`` seconds."""
+
+    def transfer(progress, task, deadline):
+        for _ in range(count):
+            speedtest.time.sleep(delay)
+            progress.update(task, advance=step)
+
+    return transfer
+
+
+def test_bidirectional_speed_directions_run_independently(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "_tcp_latency", return_value=42.0)
+    mocker.patch.object(my_speedtest_object, "_init_connection")
+    mocker.patch.object(my_speedtest_object, "_http_latency", return_value=10.0)
+    my_speedtest_object.latency = 5.0
+    my_speedtest_object.timeout = None
+
+    # ~800 Mbps down (10 MB in 0.1 s per attempt) and ~160 Mbps up (10 MB in 0.5 s per attempt)
+    download = mocker.patch.object(my_speedtest_object, "_download", side_effect=paced_transfer(1_000_000, 10, 0.01))
+    mocker.patch.object(my_speedtest_object, "_parallel_upload", side_effect=paced_transfer(250_000, 40, 0.0125))
+
+    start = speedtest.time.perf_counter()
+    bidirectional_result = my_speedtest_object.bidirectional_speed(silent=True)
+    elapsed = speedtest.time.perf_counter() - start
+
+    # The download is not held back by the upload between attempts
+    assert download.call_count == 3
+    assert bidirectional_result.download.speed > 2 * 3 * 80 / elapsed
+    assert bidirectional_result.download.speed > 3 * bidirectional_result.upload.speed
+
+
+def test_bidirectional_stability_with_uneven_directions(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "THROUGHPUT_SAMPLE_INTERVAL", 0.05)
+    mocker.patch.object(speedtest, "_tcp_latency", return_value=42.0)
+    mocker.patch.object(my_speedtest_object, "_init_connection")
+    mocker.patch.object(my_speedtest_object, "_http_latency", return_value=10.0)
+    my_speedtest_object.latency = 5.0
+    my_speedtest_object.timeout = None
+
+    # Steady on both sides, the download just finishes its attempts much sooner: its samples must
+    # stop with it instead of recording the time it would otherwise spend waiting for the upload
+    mocker.patch.object(my_speedtest_object, "_download", side_effect=paced_transfer(1_000_000, 10, 0.01))
+    mocker.patch.object(my_speedtest_object, "_parallel_upload", side_effect=paced_transfer(250_000, 40, 0.0125))
+
+    bidirectional_result = my_speedtest_object.bidirectional_speed(silent=True)
+
+    assert bidirectional_result.download.throughput_variance is not None
+    assert bidirectional_result.download.stalls == 0
+    assert bidirectional_result.upload.stalls == 0
+
+
+class SlowStream(speedtest.httpx.SyncByteStream):
+    """Response body delivered in small reads at a steady pace, like a slow link."""
+
+    def __init__(self, size: int, read_size: int, delay: float):
+        self.size = size
+        self.read_size = read_size
+        self.delay = delay
+
+    def __iter__(self):
+        for _ in range(self.size // self.read_size):
+            speedtest.time.sleep(self.delay)
+            yield b"0" * self.read_size
+
+
+def test_download_stability_on_slow_steady_link(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "THROUGHPUT_SAMPLE_INTERVAL", 0.05)
+    # Two CHUNK_SIZE worth of data at ~3 MB/s: a CHUNK_SIZE-quantized counter would sit still for
+    # several sampling intervals at a time and report stalls
+    response = speedtest.httpx.Response(200, stream=SlowStream(2 * speedtest.CHUNK_SIZE, 16 * 1024, 0.005))
+    mock_client = mocker.patch("speedtest_cloudflare_cli.core.speedtest.client")
+    mock_client.return_value.stream.return_value.__enter__.return_value = response
+
+    with speedtest.track_progress(silent=True) as progress:
+        task = progress.add_task("", total=None)
+        with speedtest.sample_throughput(progress, task) as samples:
+            my_speedtest_object._download(progress, task)
+
+    variance, stalls = stability.throughput_stability(samples, speedtest.THROUGHPUT_SAMPLE_INTERVAL)
+    assert progress.tasks[task].completed == 2 * speedtest.CHUNK_SIZE
+    assert len(samples) > 5
+    assert stalls == 0
+    assert variance is not None
+
+
+def test_probe_estimate():
+    # Not enough samples for a window: average over what was seen
+    assert speedtest._probe_estimate([(0.0, 0)]) == (None, False)
+    estimate, stable = speedtest._probe_estimate([(0.0, 0), (1.0, 1_000_000)])
+    assert estimate == pytest.approx(8.0)
+    assert not stable
+
+    # Steady 1 MB per 100 ms is 80 Mbps and settles once three non-overlapping windows agree
+    steady = [(i * 0.1, i * 1_000_000) for i in range(20)]
+    assert speedtest._probe_estimate(steady[:12]) == (pytest.approx(80.0), False)
+    estimate, stable = speedtest._probe_estimate(steady)
+    assert estimate == pytest.approx(80.0)
+    assert stable
+
+    # Still ramping up: bytes per interval keep doubling
+    ramp = [(i * 0.1, 2**i * 100_000) for i in range(10)]
+    _, stable = speedtest._probe_estimate(ramp)
+    assert not stable
+
+
+@pytest.mark.parametrize("mbps", [5, 20, 100])
+@pytest.mark.parametrize("phase", [0.0, 0.03, 0.07])
+def test_probe_estimate_chunk_granularity(mbps, phase):
+    # Progress that only moves by CHUNK_SIZE on a steady link, sampled every PROBE_SAMPLE_INTERVAL
+    bytes_per_second = mbps * 1_000_000 / 8
+    samples = []
+    for i in range(int(speedtest.PROBE_TIMEOUT_SECONDS / speedtest.PROBE_SAMPLE_INTERVAL) + 1):
+        now = i * speedtest.PROBE_SAMPLE_INTERVAL
+        chunks = int(max(now - phase, 0) * bytes_per_second // speedtest.CHUNK_SIZE)
+        samples.append((now, chunks * speedtest.CHUNK_SIZE))
+
+        # Whenever the probe would stop, its estimate must be right
+        estimate, stable = speedtest._probe_estimate(samples)
+        if stable:
+            assert estimate == pytest.approx(mbps, rel=0.05)
+
+    # Without settling, the fallback averages the whole series after the ramp
+    estimate, _ = speedtest._probe_estimate(samples)
+    assert estimate == pytest.approx(mbps, rel=0.1)
+
+
+def test_run_probe_test_stops_when_stable(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "PROBE_SAMPLE_INTERVAL", 0.01)
+
+    def fake_download(progress, task, deadline, stop):
+        assert my_speedtest_object.download_size == speedtest.MAX_TEST_SIZE_MB * speedtest.CHUNK_SIZE
+        while not speedtest._should_stop(deadline, stop):
+            speedtest.time.sleep(0.001)
+            progress.update(task, advance=10_000)
+
+    mocker.patch.object(my_speedtest_object, "_download", side_effect=fake_download)
+
+    with speedtest.track_progress(silent=True) as progress:
+        task = progress.add_task("", total=None)
+        start = speedtest.time.perf_counter()
+        probe_speed = my_speedtest_object._run_probe_test("download", progress, task)
+        elapsed = speedtest.time.perf_counter() - start
+        probe_bytes = progress.tasks[task].completed
+
+    assert probe_speed > 0
+    assert elapsed < speedtest.PROBE_TIMEOUT_SECONDS
+    # Probe bytes stay on the main task and the configured size is restored
+    assert probe_bytes > 0
+    assert my_speedtest_object.download_size == 1024
+
+
+def test_run_probe_test_chunk_steps(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(speedtest, "PROBE_SAMPLE_INTERVAL", 0.005)
+    mocker.patch.object(speedtest, "PROBE_WINDOW_SECONDS", 0.05)
+    transferred = {}
+
+    def fake_download(progress, task, deadline, stop):
+        start = speedtest.time.perf_counter()
+        chunks = 0
+        while not speedtest._should_stop(deadline, stop):
+            speedtest.time.sleep(0.02)
+            progress.update(task, advance=speedtest.CHUNK_SIZE)
+            chunks += 1
+        transferred["mbps"] = chunks * speedtest.CHUNK_SIZE * 8 / ((speedtest.time.perf_counter() - start) * 1_000_000)
+
+    mocker.patch.object(my_speedtest_object, "_download", side_effect=fake_download)
+
+    with speedtest.track_progress(silent=True) as progress:
+        task = progress.add_task("", total=None)
+        probe_speed = my_speedtest_object._run_probe_test("download", progress, task)
+
+    assert probe_speed == pytest.approx(transferred["mbps"], rel=0.25)
+
+
+def test_run_probe_test_failure(my_speedtest_object, mocker: MockerFixture):
+    mocker.patch("threading.Thread", REAL_THREAD)
+    mocker.patch.object(my_speedtest_object, "_parallel_upload", side_effect=speedtest.httpx.ConnectError("boom"))
+
+    with speedtest.track_progress(silent=True) as progress:
+        task = progress.add_task("", total=None)
+        assert my_speedtest_object._run_probe_test("upload", progress, task) is None
+
+    assert my_speedtest_object.upload_size == 1024
+
+
 # @unittest.mock.patch("speedtest_cloudflare_cli.core.speedtest.client")
 # def test_download(mock_client, my_speedtest_object, mocker: MockerFixture):
 #     my_speedtest_object._download()
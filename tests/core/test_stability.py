@@ -0,0 +1,51 @@
+import socket
+import unittest.mock
+
+import httpx
+import pytest
+
+from speedtest_cloudflare_cli.core import stability
+
+
+def test_throughput_stability():
+    # 1 MB, 1 MB, nothing, 3 MB per second
+    samples = [0, 1_000_000, 2_000_000, 2_000_000, 5_000_000]
+    variance, stalls = stability.throughput_stability(samples, interval=1.0)
+    assert variance == pytest.approx(76.0)  # speeds 8, 8, 0, 24 Mbps around a mean of 10
+    assert stalls == 1
+
+    assert stability.throughput_stability([0], interval=1.0) == (None, 0)
+    assert stability.throughput_stability([0, 0], interval=1.0) == (None, 1)
+
+
+def test_summarize_tcp_info():
+    assert stability.summarize_tcp_info([]) == (None, None, None)
+
+    infos = [
+        stability.TcpInfo(connection=("127.0.0.1", 1), retransmits=2, rtt=10.0, cwnd=10),
+        stability.TcpInfo(connection=("127.0.0.1", 2), retransmits=3, rtt=20.0, cwnd=30),
+    ]
+    assert stability.summarize_tcp_info(infos) == (5, 15.0, 20.0)
+
+
+def _response_for(sock: socket.socket | None) -> httpx.Response:
+    network_stream = unittest.mock.Mock()
+    network_stream.get_extra_info.return_value = sock
+    return httpx.Response(200, extensions={"network_stream": network_stream})
+
+
+@pytest.mark.skipif(not hasattr(socket, "TCP_INFO"), reason="TCP_INFO is Linux only")
+def test_read_tcp_info():
+    with socket.create_server(("127.0.0.1", 0)) as server, socket.create_connection(server.getsockname()) as sock:
+        tcp_info = stability.read_tcp_info(_response_for(sock))
+
+        assert tcp_info is not None
+        assert tcp_info.connection == sock.getsockname()
+        assert tcp_info.retransmits == 0
+        assert tcp_info.rtt >= 0
+        assert tcp_info.cwnd > 0
+
+
+def test_read_tcp_info_unavailable():
+    assert stability.read_tcp_info(httpx.Response(200)) is None
+    assert stability.read_tcp_info(_response_for(None)) is None
@@ -1,2 +1,51 @@
+import datetime
+import json
+
+from click.testing import CliRunner
+
+from speedtest_cloudflare_cli import main
+
+
+def test_bidirectional_rejects_single_direction(mocker):
+    speedtester = mocker.patch("speedtest_cloudflare_cli.core.speedtest.SpeedTest")
+
+    response = CliRunner().invoke(main.main, ["--bidirectional", "--download"])
+
+    assert response.exit_code == 2
+    assert "cannot be combined" in response.output
+    speedtester.assert_not_called()
+
+
+def test_compare_json(tmp_path):
+    start = datetime.datetime(2026, 9, 1, tzinfo=datetime.UTC)
+    with (tmp_path / "runs.jsonl").open("w") as fp:
+        for hour in range(48):
+            record = {
+                "download": {"speed": 100.0 if hour < 24 else 50.0, "latency": 10.0},
+                "upload": None,
+                "metadata": {"colo": "CDG", "asn": 64496},
+                "timestamp": (start + datetime.timedelta(hours=hour)).isoformat(),
+            }
+            fp.write(json.dumps(record) + "\n")
+
+    response = CliRunner().invoke(
+        main.main, ["compare", str(tmp_path), "--by", "colo", "--split", "2026-09-02", "--json"]
+    )
+
+    assert response.exit_code == 0, response.output
+    report = json.loads(response.output)
+    assert report["runs"] == 48
+    assert [group["key"] for group in report["groups"]["colo"]] == ["CDG"]
+    assert "hour" not in report["groups"]
+    assert all(check["regression"] for check in report["regressions"])
+
+
+def test_compare_rejects_empty_window(tmp_path):
+    response = CliRunner().invoke(main.main, ["compare", str(tmp_path), "--split", "2026-09-02", "--window", "0"])
+
+    assert response.exit_code == 2
+    assert "--window" in response.output
+
+
 # def test_foo():
 #     assert foo("foo") == "foo"